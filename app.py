@@ -20,7 +20,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-st.markdown("""
+# Static page blocks. They are sent on every rerun on purpose: Streamlit drops
+# elements a rerun does not emit, so sending them once per session would lose the
+# styling after the first interaction. st.html (Streamlit >= 1.33) skips the
+# Markdown parser; older versions fall back to st.markdown.
+PAGE_STYLE = """
     <style>
     /* Header styling */
     .main-header {
@@ -65,21 +69,131 @@ st.markdown("""
         padding-top: 2rem;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+FOOTER_HTML = """
+    <div style='text-align: center; color: #666; padding: 1rem;'>
+        <p><strong>Data Dashboard Application</strong> | Built with Streamlit, Python, and SQLite</p>
+        <p>Interactive analytics and visualization platform</p>
+    </div>
+"""
+
+def render_html(block):
+    """Render a static HTML block, bypassing Markdown when st.html is available."""
+    if hasattr(st, 'html'):
+        st.html(block)
+    else:
+        st.markdown(block, unsafe_allow_html=True)
+
+render_html(PAGE_STYLE)
 
 @st.cache_resource
 def get_database_manager():
     """Get cached database manager instance."""
     from src.database import DatabaseManager
-    return DatabaseManager('data/dashboard.db')
+    db_manager = DatabaseManager('data/dashboard.db')
+    # Databases created before the model declared its indexes only get them here
+    db_manager.create_indexes()
+    return db_manager
 
-@st.cache_resource
+def analyzer_is_current(analyzer):
+    """Reject a cached DuckDB analyzer once SQLite has newer data than its copy."""
+    from src.duckdb_backend import DuckDBAnalyzer, duckdb_is_stale
+    if isinstance(analyzer, DuckDBAnalyzer):
+        if duckdb_is_stale(get_database_manager().db_path, analyzer.duckdb_path):
+            # Release the old copy, so get_analyzer() opens the rebuilt file
+            # rather than reusing DuckDB's open instance for that path
+            analyzer.close()
+            return False
+    return True
+
+@st.cache_resource(validate=analyzer_is_current)
 def get_analyzer():
     """Get cached data analyzer instance."""
-    from src.analytics import DataAnalyzer
     db_manager = get_database_manager()
+    
+    # Opt into the columnar DuckDB backend with DASHBOARD_BACKEND=duckdb
+    if os.environ.get('DASHBOARD_BACKEND', 'sqlite').lower() == 'duckdb':
+        from src.duckdb_backend import DuckDBAnalyzer, DUCKDB_PATH, build_duckdb, duckdb_is_stale
+        # (Re)build the copy when it is missing or SQLite was reseeded or loaded since
+        if duckdb_is_stale(db_manager.db_path, DUCKDB_PATH):
+            build_duckdb(db_manager)
+        return DuckDBAnalyzer(DUCKDB_PATH)
+    
+    from src.analytics import DataAnalyzer
     return DataAnalyzer(db_manager)
 
+# Reference tables never change while the app runs; cache_resource shares one
+# DataFrame instead of hashing and copying it on every rerun (do not mutate)
+@st.cache_resource
+def get_region_info():
+    """Get cached region reference data."""
+    return get_analyzer().get_region_info()
+
+@st.cache_resource
+def get_category_info():
+    """Get cached category reference data."""
+    return get_analyzer().get_category_info()
+
+def as_filter_key(selection, all_options=None):
+    """
+    Turn a multiselect selection into a hashable, order-independent cache key.
+    
+    Returns None (no filter) for an empty selection or one covering all_options.
+    """
+    if not selection or (all_options is not None and set(selection) >= set(all_options)):
+        return None
+    return tuple(sorted(selection))
+
+# Cached analyzer queries, keyed on the filter values (lists passed as sorted tuples)
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_dashboard_bundle(start_date, end_date, categories=None, regions=None, segments=None):
+    """Get every dashboard aggregate from one cached round trip."""
+    return get_analyzer().get_dashboard_bundle(
+        start_date, end_date, categories, regions, segments,
+        top_n=20, limit_days=90, limit_months=24
+    )
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_sales_data(start_date, end_date, categories=None, regions=None, segments=None):
+    """Get cached filtered sales data."""
+    return get_analyzer().get_sales_data(start_date, end_date, categories, regions, segments)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_csv_bytes(start_date, end_date, categories=None, regions=None, segments=None):
+    """Get the filtered sales data serialized as CSV bytes."""
+    from src.export_utils import DataExporter
+    
+    sales_data = cached_sales_data(start_date, end_date, categories, regions, segments)
+    return DataExporter.to_csv_bytes(sales_data)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_full_report(start_date, end_date, categories=None, regions=None, segments=None):
+    """Build the multi-sheet summary report and return the workbook bytes."""
+    from io import BytesIO
+    from src.export_utils import DataExporter
+    
+    # Same arguments as the on-screen tiles, so this is a cache hit on their bundle
+    bundle = cached_dashboard_bundle(start_date, end_date, categories, regions, segments)
+    summary_dict = {
+        'Summary': pd.DataFrame([bundle['summary']]).T.reset_index(),
+        'By_Category': bundle['revenue_by_category'],
+        'By_Region': bundle['revenue_by_region'],
+        'By_Segment': bundle['revenue_by_segment'],
+        'Top_Products': bundle['top_products'],
+        'Performance': bundle['category_performance']
+    }
+    
+    # Rename summary columns
+    if not summary_dict['Summary'].empty:
+        summary_dict['Summary'].columns = ['Metric', 'Value']
+    
+    buffer = BytesIO()
+    DataExporter.write_excel_sheets(
+        buffer, {name: df for name, df in summary_dict.items() if not df.empty}
+    )
+    return buffer.getvalue()
+
 def main():
     """Main application function."""
     
@@ -106,7 +220,7 @@ def main():
             # Step 1: Create database
             status_text.text("Step 1/6: Creating database tables...")
             from src.database import DatabaseManager
-            db_manager = DatabaseManager('data/dashboard.db')
+            db_manager = DatabaseManager('data/dashboard.db', synchronous='OFF')
             progress_bar.progress(20)
             
             # Step 2: Generate sales data
@@ -131,9 +245,8 @@ def main():
             status_text.text("Step 5/6: Loading data into database...")
             from src.data_utils import DataLoader
             loader = DataLoader(db_manager)
-            loader.load_sales_data(sales_df)
-            loader.load_region_data(region_df)
-            loader.load_category_data(category_df)
+            loader.load_all(sales_df, region_df, category_df)
+            db_manager.analyze()
             progress_bar.progress(100)
             
             # Step 6: Success message
@@ -155,9 +268,9 @@ def main():
             """)
             st.stop()
     
-    # Initialize analyzer
+    # Initialize analyzer and visualizer
     try:
-        analyzer = get_analyzer()
+        get_analyzer()
         from src.visualizations import Visualizer
         visualizer = Visualizer()
     except Exception as e:
@@ -170,8 +283,15 @@ def main():
         
         # Add option to recreate database
         if st.button("Recreate Database (Delete and Start Over)"):
-            if os.path.exists('data/dashboard.db'):
-                os.remove('data/dashboard.db')
+            # Remove the WAL side files and the DuckDB/Parquet copies too so the
+            # new database starts clean
+            from src.duckdb_backend import DUCKDB_PATH, PARQUET_PATH
+            for path in ('data/dashboard.db', 'data/dashboard.db-wal', 'data/dashboard.db-shm',
+                         DUCKDB_PATH, PARQUET_PATH):
+                if os.path.exists(path):
+                    os.remove(path)
+            st.cache_data.clear()
+            st.cache_resource.clear()
             st.rerun()
         
         st.stop()
@@ -189,18 +309,20 @@ def main():
             index=1  # Default to Last 90 Days
         )
         
-        today = datetime.now()
+        # Day-aligned bounds keep the cache key stable across reruns
+        today = datetime.combine(datetime.now().date(), datetime.max.time())
+        midnight = datetime.combine(today.date(), datetime.min.time())
         if date_option == "Last 30 Days":
-            start_date = today - timedelta(days=30)
+            start_date = midnight - timedelta(days=30)
             end_date = today
         elif date_option == "Last 90 Days":
-            start_date = today - timedelta(days=90)
+            start_date = midnight - timedelta(days=90)
             end_date = today
         elif date_option == "Last 6 Months":
-            start_date = today - timedelta(days=180)
+            start_date = midnight - timedelta(days=180)
             end_date = today
         elif date_option == "Last Year":
-            start_date = today - timedelta(days=365)
+            start_date = midnight - timedelta(days=365)
             end_date = today
         elif date_option == "Custom":
             col1, col2 = st.columns(2)
@@ -218,7 +340,7 @@ def main():
         
         # Category filter
         st.subheader("Categories")
-        all_categories = ['Electronics', 'Clothing', 'Food & Beverage', 'Home & Garden', 'Sports & Outdoors']
+        all_categories = get_category_info()['category_name'].tolist()
         selected_categories = st.multiselect(
             "Select categories:",
             all_categories,
@@ -229,7 +351,7 @@ def main():
         
         # Region filter
         st.subheader("Regions")
-        all_regions = ['North America', 'Europe', 'Asia Pacific', 'Africa', 'Latin America', 'Middle East', 'Oceania']
+        all_regions = get_region_info()['region_name'].tolist()
         selected_regions = st.multiselect(
             "Select regions:",
             all_regions,
@@ -247,16 +369,18 @@ def main():
             default=all_segments
         )
     
-    # Apply filters (convert empty lists to None)
-    filter_categories = selected_categories if selected_categories else None
-    filter_regions = selected_regions if selected_regions else None
-    filter_segments = selected_segments if selected_segments else None
+    # Apply filters (convert empty lists to None, lists to hashable cache keys).
+    # Selecting every option is the same as no filter, so drop the IN (...) too.
+    filter_categories = as_filter_key(selected_categories, all_categories)
+    filter_regions = as_filter_key(selected_regions, all_regions)
+    filter_segments = as_filter_key(selected_segments, all_segments)
     
-    # Get summary statistics
-    summary = analyzer.get_sales_summary(
-        start_date, end_date, 
+    # Get all dashboard aggregates in one query batch
+    bundle = cached_dashboard_bundle(
+        start_date, end_date,
         filter_categories, filter_regions, filter_segments
     )
+    summary = bundle['summary']
     
     # KEY METRICS
     st.header(" Key Metrics")
@@ -298,12 +422,9 @@ def main():
     trend_col1, trend_col2 = st.columns(2)
     
     with trend_col1:
-        # Daily trend
-        daily_trend = analyzer.get_daily_revenue_trend(start_date, end_date)
+        # Daily trend, limited to the last 90 days for better visualization
+        daily_trend = bundle['daily_trend']
         if not daily_trend.empty:
-            # Limit to last 90 days for better visualization
-            if len(daily_trend) > 90:
-                daily_trend = daily_trend.tail(90)
             fig_daily = visualizer.create_revenue_line_chart(
                 daily_trend, 'date', 'revenue', 
                 "Daily Revenue Trend (Last 90 Days)"
@@ -313,12 +434,12 @@ def main():
             st.info("📭 No daily trend data available for selected filters")
     
     with trend_col2:
-        # Monthly trend
-        monthly_trend = analyzer.get_monthly_revenue_trend(start_date, end_date)
+        # Monthly trend, limited to the last 24 months
+        monthly_trend = bundle['monthly_trend']
         if not monthly_trend.empty:
             fig_monthly = visualizer.create_revenue_line_chart(
                 monthly_trend, 'month', 'revenue',
-                "Monthly Revenue Trend"
+                "Monthly Revenue Trend (Last 24 Months)"
             )
             st.plotly_chart(fig_monthly, use_container_width=True)
         else:
@@ -334,7 +455,7 @@ def main():
     with analysis_col1:
         st.subheader("By Category")
         # Revenue by category
-        category_revenue = analyzer.get_revenue_by_category(start_date, end_date)
+        category_revenue = bundle['revenue_by_category']
         if not category_revenue.empty:
             fig_category = visualizer.create_bar_chart(
                 category_revenue, 'category', 'total_amount',
@@ -354,7 +475,7 @@ def main():
     with analysis_col2:
         st.subheader("By Region")
         # Revenue by region
-        region_revenue = analyzer.get_revenue_by_region(start_date, end_date)
+        region_revenue = bundle['revenue_by_region']
         if not region_revenue.empty:
             fig_region = visualizer.create_bar_chart(
                 region_revenue, 'region', 'total_amount',
@@ -380,7 +501,7 @@ def main():
     
     with segment_col1:
         # Revenue by segment
-        segment_revenue = analyzer.get_revenue_by_segment(start_date, end_date)
+        segment_revenue = bundle['revenue_by_segment']
         if not segment_revenue.empty:
             fig_segment = visualizer.create_pie_chart(
                 segment_revenue, 'customer_segment', 'total_amount',
@@ -392,7 +513,7 @@ def main():
     
     with segment_col2:
         # Top products
-        top_products = analyzer.get_top_products(10, start_date, end_date)
+        top_products = bundle['top_products'].head(10)
         if not top_products.empty:
             fig_products = visualizer.create_bar_chart(
                 top_products, 'product_name', 'total_amount',
@@ -407,7 +528,7 @@ def main():
     # DETAILED PERFORMANCE TABLE
     st.header(" Category Performance Details")
     
-    performance = analyzer.get_category_performance(start_date, end_date)
+    performance = bundle['category_performance']
     if not performance.empty:
         # Format the dataframe for display
         display_df = performance.copy()
@@ -425,16 +546,21 @@ def main():
     st.header(" Export Data")
     st.markdown("Click any button below to download data directly to your computer")
     
+    # Fetch the filtered rows once for both the CSV and Excel downloads
+    sales_data = cached_sales_data(
+        start_date, end_date,
+        filter_categories, filter_regions, filter_segments
+    )
+    
     export_col1, export_col2, export_col3 = st.columns(3)
     
     with export_col1:
-        sales_data = analyzer.get_sales_data(
-            start_date, end_date,
-            filter_categories, filter_regions, filter_segments
-        )
         if not sales_data.empty:
             # Convert to CSV for download
-            csv = sales_data.to_csv(index=False).encode('utf-8')
+            csv = cached_csv_bytes(
+                start_date, end_date,
+                filter_categories, filter_regions, filter_segments
+            )
             st.download_button(
                 label=" Download CSV",
                 data=csv,
@@ -446,16 +572,12 @@ def main():
             st.warning("No data to export")
     
     with export_col2:
-        sales_data = analyzer.get_sales_data(
-            start_date, end_date,
-            filter_categories, filter_regions, filter_segments
-        )
         if not sales_data.empty:
-            # Convert to Excel for download
+            # Convert to Excel for download (streamed row by row)
             from io import BytesIO
+            from src.export_utils import DataExporter
             buffer = BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                sales_data.to_excel(writer, sheet_name='Sales Data', index=False)
+            DataExporter.write_excel_sheets(buffer, {'Sales Data': sales_data})
             buffer.seek(0)
             
             st.download_button(
@@ -469,32 +591,15 @@ def main():
             st.warning("No data to export")
     
     with export_col3:
-        # Summary report with multiple sheets
-        summary_dict = {
-            'Summary': pd.DataFrame([analyzer.get_sales_summary(start_date, end_date)]).T.reset_index(),
-            'By_Category': analyzer.get_revenue_by_category(start_date, end_date),
-            'By_Region': analyzer.get_revenue_by_region(start_date, end_date),
-            'By_Segment': analyzer.get_revenue_by_segment(start_date, end_date),
-            'Top_Products': analyzer.get_top_products(20, start_date, end_date),
-            'Performance': analyzer.get_category_performance(start_date, end_date)
-        }
-        
-        # Rename summary columns
-        if not summary_dict['Summary'].empty:
-            summary_dict['Summary'].columns = ['Metric', 'Value']
-        
-        # Create Excel with multiple sheets
-        from io import BytesIO
-        buffer = BytesIO()
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            for sheet_name, df in summary_dict.items():
-                if not df.empty:
-                    df.to_excel(writer, sheet_name=sheet_name[:31], index=False)
-        buffer.seek(0)
+        # Summary report with multiple sheets (cached as bytes per date range)
+        report_bytes = build_full_report(
+            start_date, end_date,
+            filter_categories, filter_regions, filter_segments
+        )
         
         st.download_button(
             label="Download Full Report",
-            data=buffer,
+            data=report_bytes,
             file_name=f'summary_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx',
             mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             use_container_width=True
@@ -502,12 +607,7 @@ def main():
     
     # Footer
     st.markdown("---")
-    st.markdown("""
-        <div style='text-align: center; color: #666; padding: 1rem;'>
-            <p><strong>Data Dashboard Application</strong> | Built with Streamlit, Python, and SQLite</p>
-            <p>Interactive analytics and visualization platform</p>
-        </div>
-    """, unsafe_allow_html=True)
+    render_html(FOOTER_HTML)
 
 if __name__ == "__main__":
     main()
@@ -20,11 +20,13 @@ def initialize_database():
     
     # Create database manager
     print("\n[1/6] Creating database connection...")
-    db_manager = DatabaseManager('data/dashboard.db')
+    # Seeding is a one-off bulk load, so skip fsyncs while it runs
+    db_manager = DatabaseManager('data/dashboard.db', synchronous='OFF')
     
     # Initialize tables
     print("[2/6] Creating database tables...")
     db_manager.initialize_database()
+    db_manager.create_indexes()
     
     # Generate sample data
     print("[3/6] Generating sample sales data (5000 records)...")
@@ -42,24 +44,24 @@ def initialize_database():
     print("[6/6] Loading data into database...")
     loader = DataLoader(db_manager)
     
-    success = True
-    if loader.load_sales_data(sales_df):
-        print("  ✓ Sales data loaded successfully")
+    # One transaction, so a failure never leaves a partially seeded database
+    success = loader.load_all(sales_df, region_df, category_df)
+    if success:
+        print("  ✓ Sales, region and category data loaded successfully")
     else:
-        print("  ✗ Failed to load sales data")
-        success = False
+        print("  ✗ Failed to load data, no changes were written")
     
-    if loader.load_region_data(region_df):
-        print("  ✓ Region data loaded successfully")
-    else:
-        print("  ✗ Failed to load region data")
-        success = False
+    # Refresh planner statistics so SQLite picks the new indexes
+    db_manager.analyze()
     
-    if loader.load_category_data(category_df):
-        print("  ✓ Category data loaded successfully")
-    else:
-        print("  ✗ Failed to load category data")
-        success = False
+    # Build the optional DuckDB/Parquet copy for the columnar backend
+    if success:
+        try:
+            from src.duckdb_backend import build_duckdb
+            duckdb_path = build_duckdb(db_manager)
+            print(f"  ✓ DuckDB copy written to {duckdb_path}")
+        except ImportError:
+            print("  - duckdb not installed, skipping DuckDB copy")
     
     print("\n" + "=" * 60)
     if success:
@@ -2,21 +2,26 @@
 Data Dashboard Application - Core modules.
 """
 
-from .database import DatabaseManager, SalesData, RegionInfo, ProductCategory
+from .database import (DatabaseManager, SalesData, RegionInfo, ProductCategory,
+                       DailyRevenue, MonthlyRevenue)
 from .data_utils import DataGenerator, DataLoader, DataCleaner
 from .analytics import DataAnalyzer
 from .visualizations import Visualizer
 from .export_utils import DataExporter
+from .duckdb_backend import DuckDBAnalyzer
 
 __all__ = [
     'DatabaseManager',
     'SalesData',
     'RegionInfo',
     'ProductCategory',
+    'DailyRevenue',
+    'MonthlyRevenue',
     'DataGenerator',
     'DataLoader',
     'DataCleaner',
     'DataAnalyzer',
     'Visualizer',
-    'DataExporter'
+    'DataExporter',
+    'DuckDBAnalyzer'
 ]
\ No newline at end of file
@@ -2,51 +2,240 @@
 Data query and analysis functions for the dashboard.
 """
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import func, and_, or_
-from src.database import SalesData, RegionInfo, ProductCategory
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select, func, and_, or_, desc, true, DateTime
+from src.database import SalesData, RegionInfo, ProductCategory, DailyRevenue, MonthlyRevenue
+
+try:
+    from numba import njit
+except ImportError:  # optional dependency
+    njit = None
+
+# Columns read by load_slice for the in-memory aggregation helpers
+SLICE_COLUMNS = ['category', 'product_name', 'quantity', 'unit_price',
+                 'total_amount', 'region', 'customer_segment']
+
+def _category_totals_loop(codes, n_groups, amount, quantity, price):
+    """Accumulate revenue, units, transactions and price sum per group code in one pass."""
+    revenue = np.zeros(n_groups)
+    units = np.zeros(n_groups, dtype=np.int64)
+    transactions = np.zeros(n_groups, dtype=np.int64)
+    price_total = np.zeros(n_groups)
+    for i in range(codes.size):
+        g = codes[i]
+        revenue[g] += amount[i]
+        units[g] += quantity[i]
+        transactions[g] += 1
+        price_total[g] += price[i]
+    return revenue, units, transactions, price_total
+
+def _category_totals_bincount(codes, n_groups, amount, quantity, price):
+    """NumPy fallback for _category_totals_loop when numba is not installed."""
+    return (np.bincount(codes, weights=amount, minlength=n_groups),
+            np.bincount(codes, weights=quantity, minlength=n_groups).astype(np.int64),
+            np.bincount(codes, minlength=n_groups).astype(np.int64),
+            np.bincount(codes, weights=price, minlength=n_groups))
+
+_category_totals = njit(cache=True)(_category_totals_loop) if njit else _category_totals_bincount
+
+def trailing_window_start(anchor, days=None, months=None):
+    """Return the midnight that starts the last `days` days or `months` months up to anchor."""
+    if days:
+        return datetime.combine(anchor.date() - timedelta(days=days - 1), time.min)
+    month_index = anchor.year * 12 + anchor.month - 1 - (months - 1)
+    return datetime(month_index // 12, month_index % 12 + 1, 1)
 
 class DataAnalyzer:
     """Analyze data from the database."""
     
     def __init__(self, db_manager):
-        """Initialize with database manager."""
+        """
+        Initialize with database manager.
+        
+        Queries are read-only, so they run as Core statements on pooled engine
+        connections rather than through ORM sessions.
+        """
         self.db_manager = db_manager
+        self.engine = db_manager.engine
+        self.db_manager.ensure_rollups()
     
-    def get_sales_data(self, start_date=None, end_date=None, categories=None, 
-                       regions=None, segments=None):
-        """Query sales data with filters."""
-        session = self.db_manager.get_session()
-        try:
-            query = session.query(SalesData)
-            
-            # Apply filters
+    @staticmethod
+    def _as_datetime(value, end_of_day=False):
+        """
+        Normalize a date bound to a datetime.
+        
+        Accepts datetimes, pandas Timestamps, dates and ISO strings. SQLAlchemy
+        binds the result once in the same TEXT format SQLite stores, so the
+        comparison stays index-friendly. Plain dates and date-only strings used
+        as an end bound are extended to the end of that day.
+        """
+        if value is None or value == '':
+            return None
+        if isinstance(value, pd.Timestamp):
+            return value.to_pydatetime()
+        if isinstance(value, datetime):
+            return value
+        if not isinstance(value, date):
+            text = str(value)
+            try:
+                value = date.fromisoformat(text)
+            except ValueError:
+                return datetime.fromisoformat(text)
+        return datetime.combine(value, time.max if end_of_day else time.min)
+    
+    @staticmethod
+    def _where_clause(start_date=None, end_date=None, categories=None,
+                      regions=None, segments=None):
+        """Build the WHERE clause shared by all sales queries."""
+        start_date = DataAnalyzer._as_datetime(start_date)
+        end_date = DataAnalyzer._as_datetime(end_date, end_of_day=True)
+        filters = []
+        if start_date:
+            filters.append(SalesData.transaction_date >= start_date)
+        if end_date:
+            filters.append(SalesData.transaction_date <= end_date)
+        if categories:
+            filters.append(SalesData.category.in_(categories))
+        if regions:
+            filters.append(SalesData.region.in_(regions))
+        if segments:
+            filters.append(SalesData.customer_segment.in_(segments))
+        return and_(true(), *filters)
+    
+    @staticmethod
+    def _is_day_aligned(start_date=None, end_date=None):
+        """Check whether a date range covers whole days only."""
+        return ((start_date is None or start_date.time() == time.min) and
+                (end_date is None or end_date.time() == time.max))
+    
+    def _revenue_columns(self, start_date=None, end_date=None, use_rollup=True):
+        """
+        Pick the source for revenue aggregates and return (columns, where clause).
+        
+        Whole-day ranges are answered from the daily_rev rollup, anything else
+        falls back to the raw sales_data rows.
+        """
+        start_date = self._as_datetime(start_date)
+        end_date = self._as_datetime(end_date, end_of_day=True)
+        if use_rollup and self._is_day_aligned(start_date, end_date):
             filters = []
             if start_date:
-                filters.append(SalesData.transaction_date >= start_date)
+                filters.append(DailyRevenue.d >= start_date.date())
             if end_date:
-                filters.append(SalesData.transaction_date <= end_date)
-            if categories:
-                filters.append(SalesData.category.in_(categories))
-            if regions:
-                filters.append(SalesData.region.in_(regions))
-            if segments:
-                filters.append(SalesData.customer_segment.in_(segments))
-            
-            if filters:
-                query = query.filter(and_(*filters))
-            
-            # Convert to DataFrame
-            df = pd.read_sql(query.statement, session.bind)
-            return df
-        finally:
-            session.close()
+                filters.append(DailyRevenue.d <= end_date.date())
+            columns = {
+                'date': DailyRevenue.d,
+                'month': func.strftime('%Y-%m', DailyRevenue.d),
+                'category': DailyRevenue.category,
+                'region': DailyRevenue.region,
+                'customer_segment': DailyRevenue.customer_segment,
+                'revenue': func.sum(DailyRevenue.rev),
+                'quantity': func.sum(DailyRevenue.qty),
+                'transactions': func.sum(DailyRevenue.tx),
+                'price_total': func.sum(DailyRevenue.price_sum)
+            }
+            return columns, and_(true(), *filters)
+        
+        columns = {
+            'date': func.date(SalesData.transaction_date),
+            'month': func.strftime('%Y-%m', SalesData.transaction_date),
+            'category': SalesData.category,
+            'region': SalesData.region,
+            'customer_segment': SalesData.customer_segment,
+            'product_name': SalesData.product_name,
+            'revenue': func.sum(SalesData.total_amount),
+            'quantity': func.sum(SalesData.quantity),
+            'transactions': func.count(SalesData.id),
+            'price_total': func.sum(SalesData.unit_price)
+        }
+        return columns, self._where_clause(start_date, end_date)
+    
+    def _grouped_revenue_stmt(self, group_name, start_date=None, end_date=None, limit=None):
+        """Build the query summing revenue per value of group_name, largest first."""
+        # Products are not kept in the rollup, so they always read the raw rows
+        columns, clause = self._revenue_columns(start_date, end_date,
+                                                use_rollup=group_name != 'product_name')
+        group_col = columns[group_name].label(group_name)
+        total = columns['revenue'].label('total_amount')
+        stmt = select(group_col, total)\
+                   .where(clause)\
+                   .group_by(group_col)\
+                   .order_by(desc(total))
+        if limit:
+            stmt = stmt.limit(limit)
+        return stmt
+    
+    def _read_grouped_revenue(self, group_name, start_date=None, end_date=None, limit=None):
+        """Sum revenue per value of the group_name column, largest first."""
+        with self.engine.connect() as conn:
+            return pd.read_sql(self._grouped_revenue_stmt(group_name, start_date, end_date, limit), conn)
+    
+    def get_sales_data(self, start_date=None, end_date=None, categories=None, 
+                       regions=None, segments=None, columns=None):
+        """
+        Query sales data with filters.
+        
+        Pass a list of column names to only read those columns; by default
+        every sales_data column is returned.
+        """
+        table = SalesData.__table__
+        selected = [table.c[name] for name in columns] if columns else list(table.c)
+        stmt = select(*selected).where(
+            self._where_clause(start_date, end_date, categories, regions, segments)
+        )
+        parse_dates = [col.name for col in selected if isinstance(col.type, DateTime)]
+        
+        with self.engine.connect() as conn:
+            df = pd.read_sql(stmt, conn, parse_dates=parse_dates)
+        return df
+    
+    def load_slice(self, start_date=None, end_date=None):
+        """
+        Read the sales rows in a date range once, with only the columns the
+        *_from_frame helpers need, so several aggregates can share one query.
+        """
+        return self.get_sales_data(start_date, end_date, columns=SLICE_COLUMNS)
+    
+    def _summary_stmt(self, start_date=None, end_date=None, categories=None,
+                      regions=None, segments=None):
+        """Build the single-row summary statistics query."""
+        return select(
+            func.sum(SalesData.total_amount),
+            func.count(SalesData.id),
+            func.avg(SalesData.total_amount),
+            func.sum(SalesData.quantity),
+            func.count(func.distinct(SalesData.product_name)),
+            func.count(func.distinct(SalesData.category))
+        ).where(self._where_clause(start_date, end_date, categories, regions, segments))
+    
+    @staticmethod
+    def _summary_from_row(row):
+        """Turn the summary query row into the summary dict ({} when nothing matched)."""
+        if not row[1]:
+            return {}
+        
+        summary = {
+            'total_revenue': row[0],
+            'total_transactions': row[1],
+            'avg_transaction_value': row[2],
+            'total_quantity_sold': row[3],
+            'unique_products': row[4],
+            'unique_categories': row[5]
+        }
+        return summary
     
     def get_sales_summary(self, start_date=None, end_date=None, categories=None,
                          regions=None, segments=None):
         """Get summary statistics for sales data."""
-        df = self.get_sales_data(start_date, end_date, categories, regions, segments)
-        
+        stmt = self._summary_stmt(start_date, end_date, categories, regions, segments)
+        with self.engine.connect() as conn:
+            return self._summary_from_row(conn.execute(stmt).one())
+    
+    @staticmethod
+    def summary_from_frame(df):
+        """Compute the summary statistics dict from already-loaded sales rows."""
         if df.empty:
             return {}
         
@@ -62,96 +251,200 @@ class DataAnalyzer:
     
     def get_revenue_by_category(self, start_date=None, end_date=None):
         """Get revenue grouped by category."""
-        df = self.get_sales_data(start_date, end_date)
-        if df.empty:
-            return pd.DataFrame()
-        
-        return df.groupby('category')['total_amount'].sum().reset_index()\
-                 .sort_values('total_amount', ascending=False)
+        return self._read_grouped_revenue('category', start_date, end_date)
     
     def get_revenue_by_region(self, start_date=None, end_date=None):
         """Get revenue grouped by region."""
-        df = self.get_sales_data(start_date, end_date)
-        if df.empty:
-            return pd.DataFrame()
-        
-        return df.groupby('region')['total_amount'].sum().reset_index()\
-                 .sort_values('total_amount', ascending=False)
+        return self._read_grouped_revenue('region', start_date, end_date)
     
     def get_revenue_by_segment(self, start_date=None, end_date=None):
         """Get revenue grouped by customer segment."""
-        df = self.get_sales_data(start_date, end_date)
-        if df.empty:
-            return pd.DataFrame()
+        return self._read_grouped_revenue('customer_segment', start_date, end_date)
+    
+    @staticmethod
+    def _latest_transaction_date(conn):
+        """Get the most recent transaction timestamp (None when there are no sales)."""
+        return conn.execute(select(func.max(SalesData.transaction_date))).scalar()
+    
+    def _trailing_window(self, conn, start_date=None, end_date=None, days=None, months=None):
+        """
+        Narrow a date range to at most the last `days` days or `months` months.
         
-        return df.groupby('customer_segment')['total_amount'].sum().reset_index()\
-                 .sort_values('total_amount', ascending=False)
+        The window ends at end_date, or at the latest transaction (looked up on
+        conn) when the range is open-ended, and always starts at midnight.
+        """
+        start_date = self._as_datetime(start_date)
+        end_date = self._as_datetime(end_date, end_of_day=True)
+        if not days and not months:
+            return start_date, end_date
+        
+        anchor = end_date or self._latest_transaction_date(conn)
+        if anchor is None:
+            return start_date, end_date
+        
+        window_start = trailing_window_start(anchor, days, months)
+        if start_date is None or window_start > start_date:
+            start_date = window_start
+        return start_date, end_date
     
-    def get_daily_revenue_trend(self, start_date=None, end_date=None):
-        """Get daily revenue trend."""
-        df = self.get_sales_data(start_date, end_date)
-        if df.empty:
+    def _daily_trend_stmt(self, conn, start_date=None, end_date=None, limit_days=None):
+        """Build the revenue-per-day query (conn resolves an open-ended window)."""
+        start_date, end_date = self._trailing_window(conn, start_date, end_date, days=limit_days)
+        columns, clause = self._revenue_columns(start_date, end_date)
+        day = columns['date'].label('date')
+        return select(day, columns['revenue'].label('revenue'))\
+                   .where(clause)\
+                   .group_by(day)\
+                   .order_by(day)
+    
+    @staticmethod
+    def _finish_daily_trend(daily):
+        """Post-process the revenue-per-day query result."""
+        if daily.empty:
             return pd.DataFrame()
         
-        df['date'] = pd.to_datetime(df['transaction_date']).dt.date
-        daily = df.groupby('date')['total_amount'].sum().reset_index()
-        daily.columns = ['date', 'revenue']
-        return daily.sort_values('date')
+        daily['date'] = pd.to_datetime(daily['date'])
+        return daily
     
-    def get_monthly_revenue_trend(self, start_date=None, end_date=None):
-        """Get monthly revenue trend."""
-        df = self.get_sales_data(start_date, end_date)
+    def get_daily_revenue_trend(self, start_date=None, end_date=None, limit_days=None):
+        """Get daily revenue trend, optionally limited to the last limit_days days."""
+        with self.engine.connect() as conn:
+            daily = pd.read_sql(self._daily_trend_stmt(conn, start_date, end_date, limit_days), conn)
+        return self._finish_daily_trend(daily)
+    
+    def _monthly_trend_stmt(self, conn, start_date=None, end_date=None, limit_months=None):
+        """Build the revenue-per-month query (conn resolves an open-ended window)."""
+        start_date, end_date = self._trailing_window(conn, start_date, end_date, months=limit_months)
+        columns, clause = self._revenue_columns(start_date, end_date)
+        if start_date is None and end_date is None:
+            # All-time trend reads the (smaller) monthly rollup directly
+            columns = {'month': MonthlyRevenue.m, 'revenue': func.sum(MonthlyRevenue.rev)}
+        month = columns['month'].label('month')
+        return select(month, columns['revenue'].label('revenue'))\
+                   .where(clause)\
+                   .group_by(month)\
+                   .order_by(month)
+    
+    @staticmethod
+    def _finish_monthly_trend(monthly):
+        """Post-process the revenue-per-month query result."""
+        if monthly.empty:
+            return pd.DataFrame()
+        return monthly
+    
+    def get_monthly_revenue_trend(self, start_date=None, end_date=None, limit_months=None):
+        """Get monthly revenue trend, optionally limited to the last limit_months months."""
+        with self.engine.connect() as conn:
+            monthly = pd.read_sql(self._monthly_trend_stmt(conn, start_date, end_date, limit_months), conn)
+        return self._finish_monthly_trend(monthly)
+    
+    @staticmethod
+    def grouped_revenue_from_frame(df, group_col, n=None):
+        """Sum revenue per group_col from already-loaded sales rows, largest first."""
         if df.empty:
             return pd.DataFrame()
-        
-        df['month'] = pd.to_datetime(df['transaction_date']).dt.to_period('M')
-        monthly = df.groupby('month')['total_amount'].sum().reset_index()
-        monthly['month'] = monthly['month'].astype(str)
-        monthly.columns = ['month', 'revenue']
-        return monthly.sort_values('month')
+        grouped = df.groupby(group_col, observed=True)['total_amount'].sum().reset_index()\
+                    .sort_values('total_amount', ascending=False, ignore_index=True)
+        return grouped.head(n) if n else grouped
     
     def get_top_products(self, n=10, start_date=None, end_date=None):
         """Get top N products by revenue."""
-        df = self.get_sales_data(start_date, end_date)
-        if df.empty:
+        return self._read_grouped_revenue('product_name', start_date, end_date, limit=n)
+    
+    def _category_performance_stmt(self, start_date=None, end_date=None):
+        """Build the per-category performance query."""
+        columns, clause = self._revenue_columns(start_date, end_date)
+        revenue = columns['revenue'].label('revenue')
+        return select(
+            columns['category'].label('category'),
+            revenue,
+            columns['quantity'].label('units_sold'),
+            columns['transactions'].label('transactions'),
+            (columns['price_total'] / columns['transactions']).label('avg_price')
+        ).where(clause)\
+         .group_by(columns['category'])\
+         .order_by(desc(revenue))
+    
+    @staticmethod
+    def _finish_category_performance(performance):
+        """Add derived columns to the per-category performance query result."""
+        if performance.empty:
             return pd.DataFrame()
         
-        return df.groupby('product_name')['total_amount'].sum().reset_index()\
-                 .sort_values('total_amount', ascending=False).head(n)
+        performance['avg_transaction_value'] = performance['revenue'] / performance['transactions']
+        return performance
     
     def get_category_performance(self, start_date=None, end_date=None):
         """Get detailed performance metrics by category."""
-        df = self.get_sales_data(start_date, end_date)
+        with self.engine.connect() as conn:
+            performance = pd.read_sql(self._category_performance_stmt(start_date, end_date), conn)
+        return self._finish_category_performance(performance)
+    
+    def get_dashboard_bundle(self, start_date=None, end_date=None, categories=None,
+                             regions=None, segments=None, top_n=10,
+                             limit_days=None, limit_months=None):
+        """
+        Get every dashboard aggregate in one round trip.
+        
+        Runs the summary, trend, breakdown, top products and performance queries
+        back-to-back on a single connection inside one transaction and returns
+        them as a dict keyed by section. Filters other than the date range only
+        apply to the summary, matching the individual getters.
+        """
+        with self.engine.connect() as conn, conn.begin():
+            def read(stmt):
+                return pd.read_sql(stmt, conn)
+            
+            summary_stmt = self._summary_stmt(start_date, end_date, categories, regions, segments)
+            bundle = {
+                'summary': self._summary_from_row(conn.execute(summary_stmt).one()),
+                'daily_trend': self._finish_daily_trend(
+                    read(self._daily_trend_stmt(conn, start_date, end_date, limit_days))),
+                'monthly_trend': self._finish_monthly_trend(
+                    read(self._monthly_trend_stmt(conn, start_date, end_date, limit_months))),
+                'revenue_by_category': read(self._grouped_revenue_stmt('category', start_date, end_date)),
+                'revenue_by_region': read(self._grouped_revenue_stmt('region', start_date, end_date)),
+                'revenue_by_segment': read(self._grouped_revenue_stmt('customer_segment', start_date, end_date)),
+                'top_products': read(self._grouped_revenue_stmt('product_name', start_date, end_date, top_n)),
+                'category_performance': self._finish_category_performance(
+                    read(self._category_performance_stmt(start_date, end_date)))
+            }
+        return bundle
+    
+    @staticmethod
+    def category_performance_from_frame(df):
+        """Compute category performance metrics from already-loaded sales rows."""
         if df.empty:
             return pd.DataFrame()
         
-        performance = df.groupby('category').agg({
-            'total_amount': 'sum',
-            'quantity': 'sum',
-            'id': 'count',
-            'unit_price': 'mean'
-        }).reset_index()
+        codes, categories = pd.factorize(df['category'])
+        valid = codes >= 0
+        revenue, units, transactions, price_total = _category_totals(
+            codes[valid].astype(np.int64),
+            len(categories),
+            df['total_amount'].to_numpy(dtype=np.float64)[valid],
+            df['quantity'].to_numpy(dtype=np.int64)[valid],
+            df['unit_price'].to_numpy(dtype=np.float64)[valid]
+        )
         
-        performance.columns = ['category', 'revenue', 'units_sold', 
-                              'transactions', 'avg_price']
+        performance = pd.DataFrame({
+            'category': categories,
+            'revenue': revenue,
+            'units_sold': units,
+            'transactions': transactions,
+            'avg_price': price_total / transactions
+        })
         performance['avg_transaction_value'] = performance['revenue'] / performance['transactions']
-        
-        return performance.sort_values('revenue', ascending=False)
+        return performance.sort_values('revenue', ascending=False, ignore_index=True)
     
     def get_region_info(self):
         """Get region information."""
-        session = self.db_manager.get_session()
-        try:
-            df = pd.read_sql(session.query(RegionInfo).statement, session.bind)
-            return df
-        finally:
-            session.close()
+        with self.engine.connect() as conn:
+            df = pd.read_sql(select(RegionInfo.__table__), conn)
+        return df
     
     def get_category_info(self):
         """Get category information."""
-        session = self.db_manager.get_session()
-        try:
-            df = pd.read_sql(session.query(ProductCategory).statement, session.bind)
-            return df
-        finally:
-            session.close()
\ No newline at end of file
+        with self.engine.connect() as conn:
+            df = pd.read_sql(select(ProductCategory.__table__), conn)
+        return df
\ No newline at end of file
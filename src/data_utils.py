@@ -5,18 +5,27 @@ Data generation and loading utilities for the dashboard.
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
 from src.database import DatabaseManager, SalesData, RegionInfo, ProductCategory
 
 class DataGenerator:
     """Generate sample data for the dashboard."""
     
     @staticmethod
-    def generate_sales_data(num_records=5000):
-        """Generate synthetic sales data."""
-        np.random.seed(42)
-        random.seed(42)
+    def generate_sales_data(num_records=5000, compact=False):
+        """
+        Generate synthetic sales data.
         
+        compact returns categorical text columns and uint8/float32 numerics for
+        in-memory use; leave it off when loading into the database, where
+        float32 prices would lose cents precision.
+        """
+        start_date = datetime.now() - timedelta(days=730)  # 2 years of data (2024-2026)
+        return DataGenerator._generate_chunk(np.random.default_rng(42), num_records,
+                                             start_date, compact)
+    
+    @staticmethod
+    def _generate_chunk(rng, num_records, start_date, compact=False):
+        """Draw num_records synthetic sales rows from rng, dated from start_date on."""
         categories = ['Electronics', 'Clothing', 'Food & Beverage', 'Home & Garden', 'Sports & Outdoors']
         regions = ['North America', 'Europe', 'Asia Pacific', 'Africa', 'Latin America', 'Middle East', 'Oceania']
         segments = ['Consumer', 'Corporate', 'Home Office']
@@ -28,30 +37,45 @@ class DataGenerator:
             'Home & Garden': ['Plant', 'Furniture', 'Cookware', 'Bedding', 'Decor'],
             'Sports & Outdoors': ['Yoga Mat', 'Dumbbell', 'Bicycle', 'Tent', 'Running Shoes']
         }
+        # One row of products per category, so products_arr[cat, i] is the i-th product of cat
+        products_arr = np.array([products[category] for category in categories])
         
-        data = []
-        start_date = datetime.now() - timedelta(days=730)  # 2 years of data (2024-2026)
+        # Draw every column at once instead of row by row; labels are drawn as
+        # codes with rng.choice so weights (p=) can be added per column
+        cat_idx = rng.choice(len(categories), size=num_records)
+        product_idx = rng.choice(products_arr.shape[1], size=num_records)
+        quantity = rng.integers(1, 21, num_records)
+        unit_price = np.round(rng.uniform(10, 500, num_records), 2)
+        total = np.round(quantity * unit_price, 2)
+        day_offsets = rng.integers(0, 731, num_records)
+        region_idx = rng.choice(len(regions), size=num_records)
+        segment_idx = rng.choice(len(segments), size=num_records)
         
-        for _ in range(num_records):
-            category = random.choice(categories)
-            product = random.choice(products[category])
-            quantity = random.randint(1, 20)
-            unit_price = round(random.uniform(10, 500), 2)
-            total = round(quantity * unit_price, 2)
-            
-            record = {
-                'transaction_date': start_date + timedelta(days=random.randint(0, 730)),
-                'category': category,
-                'product_name': product,
-                'quantity': quantity,
-                'unit_price': unit_price,
-                'total_amount': total,
-                'region': random.choice(regions),
-                'customer_segment': random.choice(segments)
-            }
-            data.append(record)
+        if compact:
+            # Build categoricals straight from the drawn codes, never materializing the strings
+            n_products = products_arr.shape[1]
+            return pd.DataFrame({
+                'transaction_date': pd.Timestamp(start_date) + pd.to_timedelta(day_offsets, unit='D'),
+                'category': pd.Categorical.from_codes(cat_idx, categories),
+                'product_name': pd.Categorical.from_codes(cat_idx * n_products + product_idx,
+                                                          products_arr.ravel()),
+                'quantity': quantity.astype(np.uint8),
+                'unit_price': unit_price.astype(np.float32),
+                'total_amount': total.astype(np.float32),
+                'region': pd.Categorical.from_codes(region_idx, regions),
+                'customer_segment': pd.Categorical.from_codes(segment_idx, segments)
+            })
         
-        return pd.DataFrame(data)
+        return pd.DataFrame({
+            'transaction_date': pd.Timestamp(start_date) + pd.to_timedelta(day_offsets, unit='D'),
+            'category': np.array(categories).take(cat_idx),
+            'product_name': products_arr[cat_idx, product_idx],
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'total_amount': total,
+            'region': np.array(regions).take(region_idx),
+            'customer_segment': np.array(segments).take(segment_idx)
+        })
     
     @staticmethod
     def generate_region_data():
@@ -79,6 +103,14 @@ class DataGenerator:
         ]
         return pd.DataFrame(categories)
 
+# Columns each loader writes, in table order
+LOAD_COLUMNS = {
+    SalesData: ['transaction_date', 'category', 'product_name', 'quantity',
+                'unit_price', 'total_amount', 'region', 'customer_segment', 'created_at'],
+    RegionInfo: ['region_name', 'country', 'population', 'avg_income'],
+    ProductCategory: ['category_name', 'description', 'margin_percentage']
+}
+
 class DataLoader:
     """Load data into the database."""
     
@@ -86,71 +118,79 @@ class DataLoader:
         """Initialize with database manager."""
         self.db_manager = db_manager
     
+    @staticmethod
+    def _insert_frame(conn, model, df, chunksize=10_000):
+        """Append a DataFrame to model's table on an open connection."""
+        if model is SalesData:
+            # to_sql bypasses the ORM column default, so stamp created_at here
+            df = df.assign(created_at=datetime.utcnow())
+        # Plain executemany batches; method='multi' is several times slower on SQLite
+        df[LOAD_COLUMNS[model]].to_sql(model.__tablename__, conn, if_exists='append',
+                                       index=False, chunksize=chunksize)
+    
+    def load_all(self, sales_df, region_df, category_df):
+        """Load sales, region and category data in a single transaction."""
+        try:
+            with self.db_manager.engine.begin() as conn:
+                self._insert_frame(conn, SalesData, sales_df)
+                self._insert_frame(conn, RegionInfo, region_df)
+                self._insert_frame(conn, ProductCategory, category_df)
+                self.db_manager.refresh_rollups(conn)
+            return True
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return False
+    
+    def generate_and_load(self, num_records, chunk=100_000):
+        """
+        Generate and insert synthetic sales data chunk by chunk in one transaction.
+        
+        Only one chunk is held in memory at a time, so very large seeds (e.g.
+        for benchmarking) do not need the whole frame up front.
+        """
+        rng = np.random.default_rng(42)
+        start_date = datetime.now() - timedelta(days=730)
+        try:
+            with self.db_manager.engine.begin() as conn:
+                for offset in range(0, num_records, chunk):
+                    df = DataGenerator._generate_chunk(rng, min(chunk, num_records - offset), start_date)
+                    self._insert_frame(conn, SalesData, df)
+                self.db_manager.refresh_rollups(conn)
+            return True
+        except Exception as e:
+            print(f"Error generating sales data: {e}")
+            return False
+    
     def load_sales_data(self, df):
         """Load sales data into database."""
-        session = self.db_manager.get_session()
         try:
-            for _, row in df.iterrows():
-                sale = SalesData(
-                    transaction_date=row['transaction_date'],
-                    category=row['category'],
-                    product_name=row['product_name'],
-                    quantity=row['quantity'],
-                    unit_price=row['unit_price'],
-                    total_amount=row['total_amount'],
-                    region=row['region'],
-                    customer_segment=row['customer_segment']
-                )
-                session.add(sale)
-            session.commit()
+            with self.db_manager.engine.begin() as conn:
+                self._insert_frame(conn, SalesData, df)
+                self.db_manager.refresh_rollups(conn)
             return True
         except Exception as e:
-            session.rollback()
             print(f"Error loading sales data: {e}")
             return False
-        finally:
-            session.close()
     
     def load_region_data(self, df):
         """Load region data into database."""
-        session = self.db_manager.get_session()
         try:
-            for _, row in df.iterrows():
-                region = RegionInfo(
-                    region_name=row['region_name'],
-                    country=row['country'],
-                    population=row['population'],
-                    avg_income=row['avg_income']
-                )
-                session.add(region)
-            session.commit()
+            with self.db_manager.engine.begin() as conn:
+                self._insert_frame(conn, RegionInfo, df)
             return True
         except Exception as e:
-            session.rollback()
             print(f"Error loading region data: {e}")
             return False
-        finally:
-            session.close()
     
     def load_category_data(self, df):
         """Load category data into database."""
-        session = self.db_manager.get_session()
         try:
-            for _, row in df.iterrows():
-                category = ProductCategory(
-                    category_name=row['category_name'],
-                    description=row['description'],
-                    margin_percentage=row['margin_percentage']
-                )
-                session.add(category)
-            session.commit()
+            with self.db_manager.engine.begin() as conn:
+                self._insert_frame(conn, ProductCategory, df)
             return True
         except Exception as e:
-            session.rollback()
             print(f"Error loading category data: {e}")
             return False
-        finally:
-            session.close()
 
 class DataCleaner:
     """Clean and validate data."""
@@ -163,23 +203,47 @@ class DataCleaner:
         
         # Handle missing values
         df = df.dropna(subset=['transaction_date', 'category', 'product_name'])
-        df['customer_segment'] = df['customer_segment'].fillna('Unknown')
         
-        # Validate numeric columns
-        df = df[df['quantity'] > 0]
-        df = df[df['unit_price'] > 0]
-        df = df[df['total_amount'] > 0]
+        # Validate numeric columns in a single pass
+        df = df.loc[(df['quantity'] > 0) & (df['unit_price'] > 0) & (df['total_amount'] > 0)]
         
-        # Ensure consistent capitalization
-        df['category'] = df['category'].str.strip().str.title()
-        df['region'] = df['region'].str.strip().str.title()
-        df['customer_segment'] = df['customer_segment'].str.strip().str.title()
-        
-        # Recalculate total_amount to ensure consistency
-        df['total_amount'] = df['quantity'] * df['unit_price']
+        # Ensure consistent capitalization and recalculate total_amount for consistency
+        df = df.assign(
+            category=DataCleaner._normalize_labels(df['category']),
+            region=DataCleaner._normalize_labels(df['region']),
+            customer_segment=DataCleaner._normalize_labels(df['customer_segment'], fill_value='Unknown'),
+            total_amount=df['quantity'].to_numpy() * df['unit_price'].to_numpy()
+        )
         
         return df
     
+    @staticmethod
+    def _normalize_labels(series, fill_value=None):
+        """
+        Strip and title-case a low-cardinality text column, keeping its dtype.
+        
+        Categorical and object columns only transform their distinct values
+        (labels that collapse to the same text are merged); Arrow-backed
+        string columns are already fastest with the vectorized .str methods.
+        Missing values are replaced by fill_value when given.
+        """
+        is_categorical = isinstance(series.dtype, pd.CategoricalDtype)
+        if fill_value is not None:
+            if is_categorical and fill_value not in series.cat.categories:
+                series = series.cat.add_categories([fill_value])
+            series = series.fillna(fill_value)
+        if not is_categorical and series.dtype != object:
+            return series.str.strip().str.title()
+        
+        labels = series.astype('category')
+        cleaned, merged = pd.factorize(labels.cat.categories.str.strip().str.title())
+        codes = labels.cat.codes.to_numpy()
+        normalized = pd.Series(
+            pd.Categorical.from_codes(np.where(codes >= 0, cleaned[codes], -1), merged),
+            index=series.index, name=series.name
+        )
+        return normalized if is_categorical else normalized.astype(object)
+    
     @staticmethod
     def validate_date_range(df, date_column, start_date=None, end_date=None):
         """Validate and filter date range."""
@@ -2,7 +2,8 @@
 Database models and connection handler for the Data Dashboard Application.
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import (create_engine, event, text, func, select, insert, delete, Index,
+                        Column, Integer, String, Float, Date, DateTime, ForeignKey)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -10,9 +11,27 @@ import os
 
 Base = declarative_base()
 
+# Connection pragmas for the read-heavy dashboard workload
+SQLITE_PRAGMAS = [
+    "journal_mode=WAL",
+    "temp_store=MEMORY",
+    "cache_size=-200000",     # 200 MB page cache
+    "mmap_size=268435456"     # 256 MB memory-mapped I/O
+]
+
 class SalesData(Base):
     """Sales transaction data model."""
     __tablename__ = 'sales_data'
+    # Indexes backing the dashboard's date range + IN (...) filters; the
+    # composites also serve lookups on their leading column alone
+    __table_args__ = (
+        Index('idx_sales_date', 'transaction_date'),
+        Index('idx_sales_cat_date', 'category', 'transaction_date'),
+        Index('idx_sales_region_date', 'region', 'transaction_date'),
+        Index('idx_sales_segment_date', 'customer_segment', 'transaction_date'),
+        Index('idx_sales_covering', 'transaction_date', 'category', 'region',
+              'customer_segment', 'total_amount', 'quantity')
+    )
     
     id = Column(Integer, primary_key=True)
     transaction_date = Column(DateTime, nullable=False)
@@ -44,13 +63,56 @@ class ProductCategory(Base):
     description = Column(String(200))
     margin_percentage = Column(Float)
 
+class DailyRevenue(Base):
+    """Per-day sales rollup, rebuilt from sales_data by refresh_rollups()."""
+    __tablename__ = 'daily_rev'
+    __table_args__ = (Index('idx_daily_rev', 'd', 'category', 'region', 'customer_segment'),)
+    
+    id = Column(Integer, primary_key=True)
+    d = Column(Date, nullable=False)
+    category = Column(String(50), nullable=False)
+    region = Column(String(50), nullable=False)
+    customer_segment = Column(String(50))
+    rev = Column(Float, nullable=False)
+    qty = Column(Integer, nullable=False)
+    tx = Column(Integer, nullable=False)
+    price_sum = Column(Float, nullable=False)
+
+class MonthlyRevenue(Base):
+    """Per-month sales rollup, rebuilt from sales_data by refresh_rollups()."""
+    __tablename__ = 'monthly_rev'
+    __table_args__ = (Index('idx_monthly_rev', 'm', 'category', 'region', 'customer_segment'),)
+    
+    id = Column(Integer, primary_key=True)
+    m = Column(String(7), nullable=False)
+    category = Column(String(50), nullable=False)
+    region = Column(String(50), nullable=False)
+    customer_segment = Column(String(50))
+    rev = Column(Float, nullable=False)
+    qty = Column(Integer, nullable=False)
+    tx = Column(Integer, nullable=False)
+    price_sum = Column(Float, nullable=False)
+
 class DatabaseManager:
     """Manages database connections and operations."""
     
-    def __init__(self, db_path='data/dashboard.db'):
-        """Initialize database connection."""
+    def __init__(self, db_path='data/dashboard.db', synchronous='NORMAL'):
+        """
+        Initialize database connection.
+        
+        synchronous sets PRAGMA synchronous for every connection; pass 'OFF'
+        for one-off bulk loads where durability on power loss is not needed.
+        """
         self.db_path = db_path
         self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
+        
+        @event.listens_for(self.engine, "connect")
+        def _sqlite_pragmas(dbapi_conn, _):
+            cursor = dbapi_conn.cursor()
+            for pragma in SQLITE_PRAGMAS + [f"synchronous={synchronous}"]:
+                cursor.execute(f"PRAGMA {pragma}")
+            cursor.close()
+        
         Base.metadata.create_all(self.engine)
         self.Session = sessionmaker(bind=self.engine)
     
@@ -62,6 +124,62 @@ class DatabaseManager:
         """Create all tables."""
         Base.metadata.create_all(self.engine)
         
+    def create_indexes(self):
+        """Add any missing model indexes to tables created before they were declared."""
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+    
+    def analyze(self):
+        """Refresh SQLite query planner statistics (run after loading data)."""
+        with self.engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+    
+    def refresh_rollups(self, conn=None):
+        """
+        Rebuild the daily and monthly rollup tables from sales_data.
+        
+        Pass conn to run inside the caller's transaction; otherwise the
+        refresh commits on its own.
+        """
+        if conn is None:
+            with self.engine.begin() as conn:
+                return self.refresh_rollups(conn)
+        
+        periods = [
+            (DailyRevenue, 'd', func.date(SalesData.transaction_date)),
+            (MonthlyRevenue, 'm', func.strftime('%Y-%m', SalesData.transaction_date))
+        ]
+        for model, period_col, period in periods:
+            grouped = select(
+                period,
+                SalesData.category,
+                SalesData.region,
+                SalesData.customer_segment,
+                func.sum(SalesData.total_amount),
+                func.sum(SalesData.quantity),
+                func.count(SalesData.id),
+                func.sum(SalesData.unit_price)
+            ).group_by(period, SalesData.category, SalesData.region, SalesData.customer_segment)
+            
+            conn.execute(delete(model))
+            conn.execute(insert(model).from_select(
+                [period_col, 'category', 'region', 'customer_segment',
+                 'rev', 'qty', 'tx', 'price_sum'],
+                grouped
+            ))
+    
+    def ensure_rollups(self):
+        """Rebuild the rollup tables when they do not account for every sales_data row."""
+        # Rows written past DataLoader (ORM sessions, external tools) leave the
+        # rollups behind; their transaction counts then no longer add up
+        with self.engine.connect() as conn:
+            rolled_up = conn.execute(select(func.coalesce(func.sum(DailyRevenue.tx), 0))).scalar()
+            sales = conn.execute(select(func.count(SalesData.id))).scalar()
+        if rolled_up != sales:
+            self.refresh_rollups()
+    
     def drop_all_tables(self):
         """Drop all tables (use with caution)."""
         Base.metadata.drop_all(self.engine)
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""
+DuckDB analytical backend for the dashboard.
+
+Mirrors the DataAnalyzer interface but runs the aggregations on a columnar
+DuckDB copy of the SQLite data. Requires the optional `duckdb` package.
+"""
+
+import os
+import pandas as pd
+from src.analytics import SLICE_COLUMNS, DataAnalyzer
+
+try:
+    import duckdb
+except ImportError:  # optional dependency
+    duckdb = None
+
+DUCKDB_PATH = 'data/dashboard.duckdb'
+PARQUET_PATH = 'data/sales.parquet'
+
+def _require_duckdb():
+    """Raise a helpful error when duckdb is not installed."""
+    if duckdb is None:
+        raise ImportError("The DuckDB backend requires the 'duckdb' package (pip install duckdb)")
+
+def duckdb_is_stale(sqlite_path, duckdb_path=DUCKDB_PATH):
+    """Tell whether the DuckDB copy is missing or older than the SQLite data it mirrors."""
+    if not os.path.exists(duckdb_path):
+        return True
+    # Recent writes may still sit in the WAL file rather than the main database file.
+    # SQLite creates an empty -wal whenever a connection opens, so that one is no data.
+    sources = [path for path in (sqlite_path, f"{sqlite_path}-wal")
+               if os.path.exists(path) and os.path.getsize(path)]
+    newest = max((os.path.getmtime(path) for path in sources), default=0)
+    return os.path.getmtime(duckdb_path) < newest
+
+def build_duckdb(db_manager, duckdb_path=DUCKDB_PATH, parquet_path=PARQUET_PATH):
+    """Copy the SQLite tables into DuckDB and write the sales table to Parquet."""
+    _require_duckdb()
+    tables = {
+        'sales': 'sales_data',
+        'region_info': 'region_info',
+        'product_categories': 'product_categories'
+    }
+    
+    # Build next to the live copy and swap it in at the end: an open read-only
+    # DuckDBAnalyzer blocks a read-write connection to the same path
+    tmp_duckdb_path = f"{duckdb_path}.tmp"
+    tmp_parquet_path = f"{parquet_path}.tmp" if parquet_path else None
+    for path in (tmp_duckdb_path, f"{tmp_duckdb_path}.wal", tmp_parquet_path):
+        if path and os.path.exists(path):
+            os.remove(path)
+    
+    con = duckdb.connect(tmp_duckdb_path)
+    try:
+        with db_manager.engine.connect() as conn:
+            # Fold the WAL into the main file first, so a checkpoint on close does
+            # not leave the SQLite file newer than this copy (see duckdb_is_stale)
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            for target, source in tables.items():
+                df = pd.read_sql_table(source, conn)
+                con.register('source_df', df)
+                con.execute(f"CREATE TABLE {target} AS SELECT * FROM source_df")
+                con.unregister('source_df')
+        if parquet_path:
+            con.execute(f"COPY sales TO '{tmp_parquet_path}' (FORMAT PARQUET)")
+    finally:
+        con.close()
+    
+    os.replace(tmp_duckdb_path, duckdb_path)
+    if parquet_path:
+        os.replace(tmp_parquet_path, parquet_path)
+    return duckdb_path
+
+class DuckDBAnalyzer:
+    """Analyze data from the DuckDB copy of the database."""
+    
+    # Shared with DataAnalyzer, so both backends shape summaries and windows alike
+    _as_datetime = staticmethod(DataAnalyzer._as_datetime)
+    _summary_from_row = staticmethod(DataAnalyzer._summary_from_row)
+    
+    def __init__(self, duckdb_path=DUCKDB_PATH):
+        """Open a read-only connection to the DuckDB database."""
+        _require_duckdb()
+        self.duckdb_path = duckdb_path
+        self.con = duckdb.connect(duckdb_path, read_only=True)
+    
+    def close(self):
+        """Close the DuckDB connection, e.g. before the copy is rebuilt."""
+        self.con.close()
+    
+    @staticmethod
+    def _where_clause(start_date=None, end_date=None, categories=None,
+                      regions=None, segments=None):
+        """Build a parameterized WHERE clause shared by all sales queries."""
+        # Same bound handling as DataAnalyzer: dates/ISO strings, inclusive end day
+        start_date = DataAnalyzer._as_datetime(start_date)
+        end_date = DataAnalyzer._as_datetime(end_date, end_of_day=True)
+        filters = []
+        params = []
+        if start_date:
+            filters.append("transaction_date >= ?")
+            params.append(start_date)
+        if end_date:
+            filters.append("transaction_date <= ?")
+            params.append(end_date)
+        for col, values in (('category', categories), ('region', regions),
+                            ('customer_segment', segments)):
+            if values:
+                filters.append(f"{col} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        
+        clause = f"WHERE {' AND '.join(filters)}" if filters else ""
+        return clause, params
+    
+    def _query(self, sql, params=None):
+        """Run a query on a per-call cursor and return a DataFrame."""
+        cursor = self.con.cursor()
+        try:
+            return cursor.execute(sql, params or []).df()
+        finally:
+            cursor.close()
+    
+    def _read_grouped_revenue(self, group_col, start_date=None, end_date=None, limit=None):
+        """Sum revenue per value of group_col, largest first."""
+        where, params = self._where_clause(start_date, end_date)
+        sql = f"""
+            SELECT {group_col}, SUM(total_amount) AS total_amount
+            FROM sales {where}
+            GROUP BY {group_col}
+            ORDER BY total_amount DESC
+        """
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._query(sql, params)
+    
+    def get_sales_data(self, start_date=None, end_date=None, categories=None,
+                       regions=None, segments=None, columns=None):
+        """Query sales data with filters, optionally reading only some columns."""
+        where, params = self._where_clause(start_date, end_date, categories, regions, segments)
+        selected = ', '.join(columns) if columns else '*'
+        return self._query(f"SELECT {selected} FROM sales {where}", params)
+    
+    def load_slice(self, start_date=None, end_date=None):
+        """Read the sales rows in a date range with the columns the in-memory helpers need."""
+        return self.get_sales_data(start_date, end_date, columns=SLICE_COLUMNS)
+    
+    def get_sales_summary(self, start_date=None, end_date=None, categories=None,
+                         regions=None, segments=None):
+        """Get summary statistics for sales data."""
+        where, params = self._where_clause(start_date, end_date, categories, regions, segments)
+        cursor = self.con.cursor()
+        try:
+            row = cursor.execute(f"""
+                SELECT SUM(total_amount), COUNT(*), AVG(total_amount), SUM(quantity),
+                       COUNT(DISTINCT product_name), COUNT(DISTINCT category)
+                FROM sales {where}
+            """, params).fetchone()
+        finally:
+            cursor.close()
+        
+        return self._summary_from_row(row)
+    
+    def get_revenue_by_category(self, start_date=None, end_date=None):
+        """Get revenue grouped by category."""
+        return self._read_grouped_revenue('category', start_date, end_date)
+    
+    def get_revenue_by_region(self, start_date=None, end_date=None):
+        """Get revenue grouped by region."""
+        return self._read_grouped_revenue('region', start_date, end_date)
+    
+    def get_revenue_by_segment(self, start_date=None, end_date=None):
+        """Get revenue grouped by customer segment."""
+        return self._read_grouped_revenue('customer_segment', start_date, end_date)
+    
+    @staticmethod
+    def _latest_transaction_date(conn):
+        """Get the most recent transaction timestamp (None when there are no sales)."""
+        return conn.execute("SELECT MAX(transaction_date) FROM sales").fetchone()[0]
+    
+    def _trailing_window(self, start_date=None, end_date=None, days=None, months=None):
+        """Narrow a date range like DataAnalyzer._trailing_window, on a per-call cursor."""
+        cursor = self.con.cursor()
+        try:
+            return DataAnalyzer._trailing_window(self, cursor, start_date, end_date, days, months)
+        finally:
+            cursor.close()
+    
+    def get_daily_revenue_trend(self, start_date=None, end_date=None, limit_days=None):
+        """Get daily revenue trend, optionally limited to the last limit_days days."""
+        start_date, end_date = self._trailing_window(start_date, end_date, days=limit_days)
+        where, params = self._where_clause(start_date, end_date)
+        daily = self._query(f"""
+            SELECT CAST(transaction_date AS DATE) AS date, SUM(total_amount) AS revenue
+            FROM sales {where}
+            GROUP BY 1
+            ORDER BY 1
+        """, params)
+        if daily.empty:
+            return pd.DataFrame()
+        
+        daily['date'] = pd.to_datetime(daily['date'])
+        return daily
+    
+    def get_monthly_revenue_trend(self, start_date=None, end_date=None, limit_months=None):
+        """Get monthly revenue trend, optionally limited to the last limit_months months."""
+        start_date, end_date = self._trailing_window(start_date, end_date, months=limit_months)
+        where, params = self._where_clause(start_date, end_date)
+        monthly = self._query(f"""
+            SELECT strftime(transaction_date, '%Y-%m') AS month, SUM(total_amount) AS revenue
+            FROM sales {where}
+            GROUP BY 1
+            ORDER BY 1
+        """, params)
+        if monthly.empty:
+            return pd.DataFrame()
+        return monthly
+    
+    def get_top_products(self, n=10, start_date=None, end_date=None):
+        """Get top N products by revenue."""
+        return self._read_grouped_revenue('product_name', start_date, end_date, limit=n)
+    
+    def get_category_performance(self, start_date=None, end_date=None):
+        """Get detailed performance metrics by category."""
+        where, params = self._where_clause(start_date, end_date)
+        performance = self._query(f"""
+            SELECT category,
+                   SUM(total_amount) AS revenue,
+                   SUM(quantity) AS units_sold,
+                   COUNT(*) AS transactions,
+                   AVG(unit_price) AS avg_price
+            FROM sales {where}
+            GROUP BY category
+            ORDER BY revenue DESC
+        """, params)
+        if performance.empty:
+            return pd.DataFrame()
+        
+        performance['avg_transaction_value'] = performance['revenue'] / performance['transactions']
+        return performance
+    
+    def get_dashboard_bundle(self, start_date=None, end_date=None, categories=None,
+                             regions=None, segments=None, top_n=10,
+                             limit_days=None, limit_months=None):
+        """Get every dashboard aggregate as a dict keyed by section."""
+        # DuckDB runs in-process, so there is no round trip to batch
+        return {
+            'summary': self.get_sales_summary(start_date, end_date, categories, regions, segments),
+            'daily_trend': self.get_daily_revenue_trend(start_date, end_date, limit_days),
+            'monthly_trend': self.get_monthly_revenue_trend(start_date, end_date, limit_months),
+            'revenue_by_category': self.get_revenue_by_category(start_date, end_date),
+            'revenue_by_region': self.get_revenue_by_region(start_date, end_date),
+            'revenue_by_segment': self.get_revenue_by_segment(start_date, end_date),
+            'top_products': self.get_top_products(top_n, start_date, end_date),
+            'category_performance': self.get_category_performance(start_date, end_date)
+        }
+    
+    def get_region_info(self):
+        """Get region information."""
+        return self._query("SELECT * FROM region_info")
+    
+    def get_category_info(self):
+        """Get category information."""
+        return self._query("SELECT * FROM product_categories")
@@ -3,26 +3,84 @@ Data export utilities for the dashboard.
 """
 
 import pandas as pd
+import xlsxwriter
+from openpyxl.utils import get_column_letter
 from datetime import datetime
+from io import BytesIO
 import os
+from src.analytics import DataAnalyzer
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # optional dependency
+    pa = None
 
 class DataExporter:
     """Export data in various formats."""
     
     @staticmethod
-    def export_to_csv(df, filename=None):
-        """Export DataFrame to CSV."""
+    def _column_widths(df, max_width=50):
+        """Fit each column to its longest header or value, capped at max_width."""
+        return [
+            min(max(df[col].astype(str).str.len().max() if len(df) else 0, len(str(col))) + 2,
+                max_width)
+            for col in df.columns
+        ]
+    
+    @staticmethod
+    def _write_csv(df, target):
+        """
+        Write a DataFrame as CSV to a path or buffer, using pyarrow when available.
+        
+        The pyarrow output differs from pandas' in format only: every header
+        and string field is quoted, whole floats lose their '.0', timestamps
+        always carry microseconds and tz-aware ones are written in UTC with a
+        'Z' suffix. Frames Arrow cannot convert (e.g. mixed-type object
+        columns) fall back to pandas.
+        """
+        if pa is not None:
+            try:
+                pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), target)
+                return
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                if hasattr(target, 'truncate'):
+                    # Discard anything written before the failure
+                    target.seek(0)
+                    target.truncate()
+        df.to_csv(target, index=False, encoding='utf-8')
+    
+    @staticmethod
+    def export_to_csv(df, filename=None, format='csv'):
+        """
+        Export DataFrame to CSV, or to zstd-compressed Parquet with format='parquet'.
+        
+        Parquet output requires pyarrow.
+        """
+        if format not in ('csv', 'parquet'):
+            raise ValueError(f"Unsupported export format: {format}")
+        
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"export_{timestamp}.csv"
+            filename = f"export_{timestamp}.{format}"
         
         # Ensure exports directory exists
         os.makedirs('exports', exist_ok=True)
         filepath = os.path.join('exports', filename)
         
-        df.to_csv(filepath, index=False)
+        if format == 'parquet':
+            df.to_parquet(filepath, engine='pyarrow', compression='zstd', index=False)
+        else:
+            DataExporter._write_csv(df, filepath)
         return filepath
     
+    @staticmethod
+    def to_csv_bytes(df):
+        """Serialize a DataFrame to CSV bytes."""
+        buffer = BytesIO()
+        DataExporter._write_csv(df, buffer)
+        return buffer.getvalue()
+    
     @staticmethod
     def export_to_excel(df, filename=None, sheet_name='Data'):
         """Export DataFrame to Excel."""
@@ -39,12 +97,8 @@ class DataExporter:
             
             # Auto-adjust column widths
             worksheet = writer.sheets[sheet_name]
-            for idx, col in enumerate(df.columns):
-                max_length = max(
-                    df[col].astype(str).apply(len).max(),
-                    len(str(col))
-                ) + 2
-                worksheet.column_dimensions[chr(65 + idx)].width = min(max_length, 50)
+            for idx, width in enumerate(DataExporter._column_widths(df), start=1):
+                worksheet.column_dimensions[get_column_letter(idx)].width = width
         
         return filepath
     
@@ -59,32 +113,48 @@ class DataExporter:
         os.makedirs('exports', exist_ok=True)
         filepath = os.path.join('exports', filename)
         
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            for sheet_name, df in dataframes_dict.items():
-                df.to_excel(writer, sheet_name=sheet_name[:31], index=False)  # Excel sheet name limit
-                
-                # Auto-adjust column widths
-                worksheet = writer.sheets[sheet_name[:31]]
-                for idx, col in enumerate(df.columns):
-                    max_length = max(
-                        df[col].astype(str).apply(len).max(),
-                        len(str(col))
-                    ) + 2
-                    if idx < 26:  # Handle up to 26 columns (A-Z)
-                        worksheet.column_dimensions[chr(65 + idx)].width = min(max_length, 50)
+        return DataExporter.write_excel_sheets(filepath, dataframes_dict, fit_columns=True)
+    
+    @staticmethod
+    def write_excel_sheets(target, dataframes_dict, fit_columns=False):
+        """
+        Stream DataFrames to an Excel workbook (one sheet each) in constant memory.
         
-        return filepath
+        Rows are written strictly in order so xlsxwriter can flush each one to
+        disk; pandas' to_excel writes column by column, which constant_memory
+        mode does not support. target may be a file path or a BytesIO buffer.
+        fit_columns sizes each column to its contents, computed up front since
+        streamed cells cannot be measured afterwards.
+        """
+        workbook = xlsxwriter.Workbook(target, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+        })
+        try:
+            for sheet_name, df in dataframes_dict.items():
+                worksheet = workbook.add_worksheet(sheet_name[:31])  # Excel sheet name limit
+                if fit_columns:
+                    for idx, width in enumerate(DataExporter._column_widths(df)):
+                        worksheet.set_column(idx, idx, width)
+                worksheet.write_row(0, 0, [str(col) for col in df.columns])
+                for row_idx, row in enumerate(df.itertuples(index=False), start=1):
+                    worksheet.write_row(row_idx, 0, [None if pd.isna(v) else v for v in row])
+        finally:
+            workbook.close()
+        return target
     
     @staticmethod
     def create_summary_report(analyzer, start_date=None, end_date=None):
         """Create a comprehensive summary report."""
+        # Read the slice once and build every sheet from it in memory
+        sales = analyzer.load_slice(start_date, end_date)
         report_data = {
-            'Summary': pd.DataFrame([analyzer.get_sales_summary(start_date, end_date)]).T.reset_index(),
-            'Revenue_by_Category': analyzer.get_revenue_by_category(start_date, end_date),
-            'Revenue_by_Region': analyzer.get_revenue_by_region(start_date, end_date),
-            'Revenue_by_Segment': analyzer.get_revenue_by_segment(start_date, end_date),
-            'Top_Products': analyzer.get_top_products(20, start_date, end_date),
-            'Category_Performance': analyzer.get_category_performance(start_date, end_date)
+            'Summary': pd.DataFrame([DataAnalyzer.summary_from_frame(sales)]).T.reset_index(),
+            'Revenue_by_Category': DataAnalyzer.grouped_revenue_from_frame(sales, 'category'),
+            'Revenue_by_Region': DataAnalyzer.grouped_revenue_from_frame(sales, 'region'),
+            'Revenue_by_Segment': DataAnalyzer.grouped_revenue_from_frame(sales, 'customer_segment'),
+            'Top_Products': DataAnalyzer.grouped_revenue_from_frame(sales, 'product_name', 20),
+            'Category_Performance': DataAnalyzer.category_performance_from_frame(sales)
         }
         
         # Rename summary columns
@@ -4,63 +4,108 @@ Visualization functions for the dashboard using Plotly.
 
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import pandas as pd
+from collections import OrderedDict
+
+# Set the shared template once instead of passing it to every figure
+pio.templates.default = 'plotly_white'
+
+# Placeholder shown by every chart when there is nothing to plot; callers get a copy
+_EMPTY_FIG = go.Figure().add_annotation(
+    text="No data available",
+    xref="paper", yref="paper",
+    x=0.5, y=0.5, showarrow=False
+)
+
+# Recently built heatmap pivots, keyed by content hash and column names
+_PIVOT_CACHE = OrderedDict()
+_PIVOT_CACHE_SIZE = 32
 
 class Visualizer:
     """Create interactive visualizations."""
     
+    @staticmethod
+    def _pivot(df, x_col, y_col, value_col):
+        """Pivot value_col by y_col x x_col, reusing the result for identical data."""
+        data = df[[x_col, y_col, value_col]]
+        key = (int(pd.util.hash_pandas_object(data, index=False).sum()), x_col, y_col, value_col)
+        if key in _PIVOT_CACHE:
+            _PIVOT_CACHE.move_to_end(key)
+            return _PIVOT_CACHE[key]
+        
+        # pivot_table tolerates duplicate cells and skips unused category combinations
+        pivot_df = data.pivot_table(index=y_col, columns=x_col, values=value_col,
+                                    aggfunc='sum', observed=True)
+        _PIVOT_CACHE[key] = pivot_df
+        if len(_PIVOT_CACHE) > _PIVOT_CACHE_SIZE:
+            _PIVOT_CACHE.popitem(last=False)
+        return pivot_df
+    
     @staticmethod
     def create_revenue_line_chart(df, x_col, y_col, title="Revenue Trend"):
         """Create a line chart for revenue trends."""
-        if df.empty:
-            return go.Figure().add_annotation(
-                text="No data available",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
-        
-        fig = px.line(df, x=x_col, y=y_col, 
-                     title=title,
-                     labels={x_col: x_col.title(), y_col: 'Revenue ($)'},
-                     markers=True)
+        if len(df) == 0:
+            return go.Figure(_EMPTY_FIG)
+        
+        x_label = x_col.title()
+        fig = go.Figure(go.Scatter(
+            x=df[x_col].to_numpy(),
+            y=df[y_col].to_numpy(),
+            mode='lines+markers',
+            line=dict(color='#1f77b4', width=2),
+            hovertemplate=f"{x_label}=%{{x}}<br>Revenue ($)=%{{y}}<extra></extra>"
+        ))
         
         fig.update_layout(
+            title=title,
             hovermode='x unified',
-            template='plotly_white',
-            height=400
+            height=400,
+            xaxis_title=x_label,
+            yaxis_title='Revenue ($)'
         )
         
-        fig.update_traces(line_color='#1f77b4', line_width=2)
-        
         return fig
     
     @staticmethod
     def create_bar_chart(df, x_col, y_col, title="", orientation='v', color=None):
         """Create a bar chart."""
-        if df.empty:
-            return go.Figure().add_annotation(
-                text="No data available",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
+        if len(df) == 0:
+            return go.Figure(_EMPTY_FIG)
         
-        if orientation == 'h':
-            fig = px.bar(df, y=x_col, x=y_col, 
-                        title=title,
-                        orientation='h',
-                        color=color,
-                        labels={x_col: x_col.title(), y_col: 'Revenue ($)'})
+        x_label = x_col.title()
+        # Horizontal bars put the categories on the y axis
+        category_axis, value_axis = ('y', 'x') if orientation == 'h' else ('x', 'y')
+        hovertemplate = f"{x_label}=%{{{category_axis}}}<br>Revenue ($)=%{{{value_axis}}}"
+        
+        fig = go.Figure()
+        if color and pd.api.types.is_numeric_dtype(df[color]):
+            # Numeric colours map onto one continuous scale, as px.bar does
+            fig.add_trace(go.Bar(
+                **{category_axis: df[x_col].to_numpy(), value_axis: df[y_col].to_numpy()},
+                orientation=orientation,
+                marker=dict(color=df[color].to_numpy(), coloraxis='coloraxis'),
+                showlegend=False,
+                hovertemplate=f"{hovertemplate}<br>{color}=%{{marker.color}}<extra></extra>"
+            ))
+            fig.update_layout(coloraxis_colorbar_title_text=color)
         else:
-            fig = px.bar(df, x=x_col, y=y_col, 
-                        title=title,
-                        color=color,
-                        labels={x_col: x_col.title(), y_col: 'Revenue ($)'})
+            groups = df.groupby(color, sort=False, observed=True) if color else [(None, df)]
+            for name, group in groups:
+                fig.add_trace(go.Bar(
+                    **{category_axis: group[x_col].to_numpy(), value_axis: group[y_col].to_numpy()},
+                    orientation=orientation,
+                    name=None if name is None else str(name),
+                    hovertemplate=f"{hovertemplate}<extra></extra>"
+                ))
         
         fig.update_layout(
+            title=title,
+            barmode='relative',
             showlegend=True if color else False,
-            template='plotly_white',
-            height=400
+            height=400,
+            **{f'{category_axis}axis_title': x_label, f'{value_axis}axis_title': 'Revenue ($)'}
         )
         
         return fig
@@ -68,20 +113,19 @@ class Visualizer:
     @staticmethod
     def create_pie_chart(df, names_col, values_col, title="Distribution"):
         """Create a pie chart."""
-        if df.empty:
-            return go.Figure().add_annotation(
-                text="No data available",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
-        
-        fig = px.pie(df, names=names_col, values=values_col,
-                    title=title,
-                    hole=0.3)  # Donut chart
+        if len(df) == 0:
+            return go.Figure(_EMPTY_FIG)
+        
+        fig = go.Figure(go.Pie(
+            labels=df[names_col].to_numpy(),
+            values=df[values_col].to_numpy(),
+            hole=0.3,  # Donut chart
+            textposition='inside',
+            textinfo='percent+label'
+        ))
         
-        fig.update_traces(textposition='inside', textinfo='percent+label')
         fig.update_layout(
-            template='plotly_white',
+            title=title,
             height=400
         )
         
@@ -90,26 +134,23 @@ class Visualizer:
     @staticmethod
     def create_multi_bar_chart(df, x_col, y_cols, title="", barmode='group'):
         """Create a multi-series bar chart."""
-        if df.empty:
-            return go.Figure().add_annotation(
-                text="No data available",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
+        if len(df) == 0:
+            return go.Figure(_EMPTY_FIG)
         
         fig = go.Figure()
         
+        # Plain arrays take plotly's fast ndarray path instead of per-element conversion
+        x_values = df[x_col].to_numpy()
         for col in y_cols:
             fig.add_trace(go.Bar(
-                x=df[x_col],
-                y=df[col],
+                x=x_values,
+                y=df[col].to_numpy(),
                 name=col.replace('_', ' ').title()
             ))
         
         fig.update_layout(
             title=title,
             barmode=barmode,
-            template='plotly_white',
             height=400,
             xaxis_title=x_col.title(),
             yaxis_title='Value'
@@ -120,12 +161,8 @@ class Visualizer:
     @staticmethod
     def create_scatter_plot(df, x_col, y_col, color_col=None, size_col=None, title=""):
         """Create a scatter plot."""
-        if df.empty:
-            return go.Figure().add_annotation(
-                text="No data available",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
+        if len(df) == 0:
+            return go.Figure(_EMPTY_FIG)
         
         fig = px.scatter(df, x=x_col, y=y_col,
                         color=color_col,
@@ -134,25 +171,18 @@ class Visualizer:
                         labels={x_col: x_col.replace('_', ' ').title(),
                                y_col: y_col.replace('_', ' ').title()})
         
-        fig.update_layout(
-            template='plotly_white',
-            height=400
-        )
+        fig.update_layout(height=400)
         
         return fig
     
     @staticmethod
     def create_heatmap(df, x_col, y_col, value_col, title="Heatmap"):
         """Create a heatmap."""
-        if df.empty:
-            return go.Figure().add_annotation(
-                text="No data available",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
+        if len(df) == 0:
+            return go.Figure(_EMPTY_FIG)
         
         # Pivot data for heatmap
-        pivot_df = df.pivot(index=y_col, columns=x_col, values=value_col)
+        pivot_df = Visualizer._pivot(df, x_col, y_col, value_col)
         
         fig = go.Figure(data=go.Heatmap(
             z=pivot_df.values,
@@ -163,7 +193,6 @@ class Visualizer:
         
         fig.update_layout(
             title=title,
-            template='plotly_white',
             height=400,
             xaxis_title=x_col.title(),
             yaxis_title=y_col.title()
@@ -180,32 +209,28 @@ class Visualizer:
     @staticmethod
     def create_combo_chart(df, x_col, bar_cols, line_cols, title=""):
         """Create a combination chart with bars and lines."""
-        if df.empty:
-            return go.Figure().add_annotation(
-                text="No data available",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
+        if len(df) == 0:
+            return go.Figure(_EMPTY_FIG)
         
         fig = make_subplots(specs=[[{"secondary_y": True}]])
+        x_values = df[x_col].to_numpy()
         
         # Add bar traces
         for col in bar_cols:
             fig.add_trace(
-                go.Bar(x=df[x_col], y=df[col], name=col.title()),
+                go.Bar(x=x_values, y=df[col].to_numpy(), name=col.title()),
                 secondary_y=False
             )
         
         # Add line traces
         for col in line_cols:
             fig.add_trace(
-                go.Scatter(x=df[x_col], y=df[col], name=col.title(), mode='lines+markers'),
+                go.Scatter(x=x_values, y=df[col].to_numpy(), name=col.title(), mode='lines+markers'),
                 secondary_y=True
             )
         
         fig.update_layout(
             title=title,
-            template='plotly_white',
             height=400
         )
         